@@ -1,5 +1,9 @@
+import functools
 import io
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator
 import folia.main as folia
+from lxml import etree
 import csv
 import pandas as pd
 import textstat
@@ -14,20 +18,52 @@ dataset_data_map = 68
 dataset_map1 = 68
 dataset_map2 = 67
 
-# Importing Dutch stopwords from the NLTK package.
-stops = set(stopwords.words("dutch"))
+# Word meanings/additional information and variations in the frequency word list.
+base_word_pattern = re.compile(r"(\(.+\))|(_.*)|(\*.+)|(.+(?<!\()\.\.\.)")
 
+# Punctuation as removed by Textstat's remove_punctuation.
+punctuation_pattern = re.compile(r"[^\w\s]")
 
-def write_dataset(file_out: str, file_issues: str) -> None:
+
+@functools.cache
+def stop_words() -> frozenset[str]:
+    """
+    Imports the Dutch stop words from the NLTK package the first time they are needed.
+
+    :return: Set containing the Dutch stop words.
+    """
+    return frozenset(stopwords.words("dutch"))
+
+
+def dataset_files() -> Iterator[str]:
+    """
+    Generates the paths of all FoLiA xml files in the Data folder of the BasiLex-Corpus.
+
+    :return: Generator of file paths relative to the Data folder of the BasiLex-Corpus.
+    """
+    for map1 in range(dataset_data_map):
+        for map2 in range(dataset_map1):
+            for file_number in range(dataset_map2):
+
+                # The cut-off point as no further files exist in the BasiLex-Corpus.
+                if map1 == 67 and map2 == 11 and file_number == 5:
+                    return
+
+                yield str(map1) + "/" + str(map2) + "/" + str(file_number) + ".xml"
+
+
+def write_dataset(file_out: str, file_issues: str, workers: int = None) -> None:
     """
     Reads FoLiA formatted xml files from the BasiLex-Corpus and stores
     the text, type, subtype and grade in a supplied csv file; first round of preprocessing.
     The path to the corpus should be entered at the top of this file.
+    The files are read across multiple processes, the CSV files are written in the order of the corpus.
 
     WARNING: This process can take a lot of time, approx. 5 hours!
 
     :param file_out:    The CSV file in which the data should be stored.
     :param file_issues: The CSV file in which issues should be stored (unable to read or no grade).
+    :param workers:     (optional) The amount of processes reading files, set to the amount of CPUs.
     :return:            None
     """
     writer_issues = None
@@ -40,42 +76,58 @@ def write_dataset(file_out: str, file_issues: str) -> None:
         column_headers_dataset = ["text", "maintype", "type", "grade"]
         writer_dataset.writerow(column_headers_dataset)
 
-        for map1 in range(dataset_data_map):
-            for map2 in range(dataset_map1):
-                for file_number in range(dataset_map2):
-
-                    # The cut-off point as no further files exist in the BasiLex-Corpus.
-                    if map1 == 67 and map2 == 11 and file_number == 5:
-                        break
+        file_paths = list(dataset_files())
+        data_paths = [dataset_path + file_path for file_path in file_paths]
 
-                    file_path = str(map1) + "/" + str(map2) + "/" + str(file_number) + ".xml"
-                    data_path = dataset_path + file_path
-                    data_entry = read_dataset_paragraph(data_path, file_path)
-
-                    if file_issues is not None and len(data_entry) == 2:
-                        writer_issues.writerow(data_entry)
-                    else:
-                        writer_dataset.writerow(data_entry)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for data_entry in executor.map(read_dataset_paragraph, data_paths, file_paths, chunksize=64):
+                if file_issues is not None and len(data_entry) == 2:
+                    writer_issues.writerow(data_entry)
                 else:
-                    continue
-                break
-            else:
-                continue
-            break
+                    writer_dataset.writerow(data_entry)
 
     if file_issues is not None:
         issues_file.close()
 
 
+def read_metadata(file_in: str) -> dict[str, str]:
+    """
+    Reads the metadata of a FoLiA xml file without parsing the rest of the document.
+    Stops reading the file as soon as the metadata has been read.
+
+    :param file_in: A FoLiA xml file from the BasiLex-Corpus.
+    :return:        Dictionary containing the metadata ids and their values.
+    """
+    metadata = {}
+
+    for _, elem in etree.iterparse(file_in, events=("end",), tag=("{" + folia.NSFOLIA + "}meta",
+                                                                  "{" + folia.NSFOLIA + "}metadata")):
+        if elem.tag == "{" + folia.NSFOLIA + "}metadata":
+            break
+        metadata[elem.get("id")] = elem.text
+        elem.clear()
+
+    return metadata
+
+
 def read_dataset_paragraph(file_in: str, file_path: str) -> list[str]:
     """
     Tries to read a file from the BasiLex-Corpus.
+    The metadata is read first so files without a grade are not fully parsed.
     Warnings that the files have no FoLiA version could not be suppressed.
 
     :param file_in:   A FoLiA xml file from the BasiLex-Corpus.
     :param file_path: The path of a FoLiA xml file in the Data folder of the BasiLex-Corpus.
     :return:          List containing the issue with file_path or data.
     """
+    try:
+        metadata = read_metadata(file_in)
+    except etree.XMLSyntaxError:
+        return ["Cannot read file", file_path]
+
+    if "grade" not in metadata:
+        return ["No grade for entry", file_path]
+
     try:
         doc = folia.Document(file=file_in)
     except folia.ParseError:
@@ -85,11 +137,7 @@ def read_dataset_paragraph(file_in: str, file_path: str) -> list[str]:
     diction = doc.metadata
     maintype = diction["maintype"]
     subtype = diction["type"]
-
-    try:
-        grade = diction["grade"]
-    except KeyError:
-        return ["No grade for entry", file_path]
+    grade = diction["grade"]
 
     return [text, maintype, subtype, grade]
 
@@ -129,8 +177,9 @@ def filter_dataset(file_in: str, file_filtered: str, words: int = 75, sentences:
             grade_dict = {"3": 1, "4": 2, "5": 3, "6": 4, "7": 5, "8": 6, "1VO": 7, "2VO": 8}
 
     df = pd.read_csv(file_in, sep=';')
-    df = df[df["text"].apply(lambda x: len(x.split()) >= words and textstat.sentence_count(x) >= sentences)]
-    df = df[df["grade"].apply(lambda x: x in grades)]
+    df = df[(df["text"].str.split().str.len() >= words) & df["grade"].isin(frozenset(grades))]
+    # Sentences are only counted for the texts which remain after the cheaper filters.
+    df = df[df["text"].map(textstat.sentence_count) >= sentences]
     if grade_dict is not None:
         df["grade"] = df["grade"].map(grade_dict)
     df.to_csv(file_filtered, index=False)
@@ -161,7 +210,7 @@ def preprocess_frequency_list(freq_list: str, freq77_file: str, freq77_no_stop_f
     :param freq77_no_stop_file: The CSV file in which the preprocessed frequency word list without stopwords is stored.
     :return:                    None
     """
-    fl = pd.read_csv(freq_list, sep=';')
+    fl = pd.read_csv(freq_list, sep=';', usecols=["woord", "fr-total"])
 
     # Rename Dutch "woord" to English "word" and "fr-total" to "frequency".
     fl = fl.rename(columns={"woord": "word", "fr-total": "frequency"})
@@ -169,26 +218,25 @@ def preprocess_frequency_list(freq_list: str, freq77_file: str, freq77_no_stop_f
     fl = fl[["word", "frequency"]]
 
     # Remove additional information and variations to obtain base words.
-    fl.loc[:, "word"] = fl["word"].apply(lambda x: re.sub(r"(\(.+\))|(_.*)|(\*.+)|(.+(?<!\()\.\.\.)", '', x))
+    fl = fl.assign(word=fl["word"].str.replace(base_word_pattern, '', regex=True))
 
     fl = fl.sort_values(by=["frequency"], ascending=False)
 
     # Remove Dutch stopwords in the NLTK package from the frequency list.
-    fl_no_stop = fl[fl["word"].apply(lambda x: x not in stops)]
-    fl_no_stop.loc[:, ["frequency"]] = fl_no_stop["frequency"].cumsum()
+    fl_no_stop = fl[~fl["word"].isin(stop_words())]
+    fl_no_stop = fl_no_stop.assign(frequency=fl_no_stop["frequency"].cumsum())
 
     # Frequency word list with stopwords
-    fl.loc[:, "frequency"] = fl["frequency"].cumsum()
+    fl = fl.assign(frequency=fl["frequency"].cumsum())
 
     percent77 = fl["frequency"].iloc[-1] * 0.77
     percent77_no_stop = fl_no_stop["frequency"].iloc[-1] * 0.77
 
-    freq77 = fl[fl["frequency"].apply(lambda x: x <= percent77)].drop_duplicates(subset=["word"])
-    freq77_no_stop = fl_no_stop[fl_no_stop["frequency"].apply(lambda x: x <= percent77_no_stop)] \
-        .drop_duplicates(subset=["word"])
+    freq77 = fl[fl["frequency"] <= percent77].drop_duplicates(subset=["word"])
+    freq77_no_stop = fl_no_stop[fl_no_stop["frequency"] <= percent77_no_stop].drop_duplicates(subset=["word"])
 
-    freq77.loc[:, "word"] = freq77["word"].apply(lambda x: textstat.remove_punctuation(x))
-    freq77_no_stop.loc[:, "word"] = freq77_no_stop["word"].apply(lambda x: textstat.remove_punctuation(x))
+    freq77 = freq77.assign(word=freq77["word"].str.replace(punctuation_pattern, '', regex=True))
+    freq77_no_stop = freq77_no_stop.assign(word=freq77_no_stop["word"].str.replace(punctuation_pattern, '', regex=True))
 
-    freq77.loc[:, "word"].to_csv(freq77_file, index=False)
-    freq77_no_stop.loc[:, "word"].to_csv(freq77_no_stop_file, index=False)
+    freq77["word"].to_csv(freq77_file, index=False)
+    freq77_no_stop["word"].to_csv(freq77_no_stop_file, index=False)
@@ -1,18 +1,26 @@
-import textstat
+import functools
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Iterator
 import syllable_counter
 import spacy
 import pandas as pd
 from nltk.corpus import stopwords
 
-# Training of spacy text lemmatizer.
-nlp = spacy.load("nl_core_news_sm")
-
 # Importing the frequency word lists.
 freq77_list = "resources/freq77.csv"
 freq77_no_stop_list = "resources/freq77_no_stop_words.csv"
 
-# Importing Dutch stopwords from the NLTK package.
-stops = set(stopwords.words("dutch"))
+# The frequency word lists are loaded once as sets for constant time membership tests.
+freq77_words = frozenset(pd.read_csv(freq77_list)["word"].str.lower())
+freq77_no_stop_words = frozenset(pd.read_csv(freq77_no_stop_list)["word"].str.lower())
+
+# Punctuation as removed by Textstat's remove_punctuation, the table removes it from ASCII text where it is faster.
+punctuation_pattern = re.compile(r"[^\w\s]")
+punctuation_table = {code_point: None for code_point in range(128) if punctuation_pattern.match(chr(code_point))}
+
+# Sentences as found by Textstat's sentence_count.
+sentence_pattern = re.compile(r"\b[^.!?]+[.!?]*")
 
 # The score-to-grade mappings for each readability formula.
 # Edge cases for the score ranges are based upon the scores produced by the readability formulas.
@@ -31,6 +39,94 @@ cilt_mapping = {range(45, 59): [1], range(59, 64): [2], range(64, 68): [3], rang
                 range(72, 75): [5], range(75, 135): [6, 7, 8]}
 
 
+def mapping_to_table(mapping: dict[range, [int]]) -> (int, list[list[int]]):
+    """
+    Turns a score-to-grade mapping of consecutive score ranges into a lookup table indexed by score.
+    The score at index i of the table is the lowest score plus i.
+
+    :param mapping: A mapping from consecutive ranges of scores to a list (range) of school grades.
+    :return:        Tuple containing the lowest score and the list (range) of school grades per score.
+    """
+    score_ranges = sorted(mapping, key=lambda score_range: score_range.start)
+    return score_ranges[0].start, [mapping[score_range] for score_range in score_ranges for _ in score_range]
+
+
+# The score-to-grade mappings as lookup tables.
+flesch_douma_table = mapping_to_table(flesch_douma_mapping)
+leesindex_a_table = mapping_to_table(leesindex_a_mapping)
+clib_table = mapping_to_table(clib_mapping)
+cilt_table = mapping_to_table(cilt_mapping)
+
+
+@functools.cache
+def spacy_model() -> spacy.language.Language:
+    """
+    Loads the trained spaCy text lemmatizer the first time it is needed.
+    The parser and named entity recognizer are not needed for lemmatization and are disabled.
+
+    :return: The Dutch spaCy pipeline.
+    """
+    return spacy.load("nl_core_news_sm", disable=["parser", "ner"])
+
+
+@functools.cache
+def stop_words() -> frozenset[str]:
+    """
+    Imports the Dutch stop words from the NLTK package the first time they are needed.
+
+    :return: Set containing the Dutch stop words.
+    """
+    return frozenset(stopwords.words("dutch"))
+
+
+@functools.cache
+def text_syllable_counter() -> syllable_counter.SyllableCounter:
+    """
+    Creates the syllable counter, reading the CELEX dictionary, the first time it is needed.
+
+    :return: The syllable counter shared by all readability estimations.
+    """
+    return syllable_counter.SyllableCounter()
+
+
+def load_models() -> None:
+    """
+    Loads the spaCy text lemmatizer, the Dutch stop words and the syllable counter.
+    Used to initialize processes once before they score texts.
+
+    :return: None
+    """
+    spacy_model()
+    stop_words()
+    text_syllable_counter()
+
+
+def remove_punctuation(text: str) -> str:
+    """
+    Removes punctuation from a text the way Textstat's remove_punctuation does.
+    ASCII text is translated using the punctuation table, other text uses the regular expression which is faster there.
+
+    :param text: The text from which punctuation should be removed.
+    :return:     The text without punctuation.
+    """
+    if text.isascii():
+        return text.translate(punctuation_table)
+    return punctuation_pattern.sub('', text)
+
+
+def count_sentences(text: str) -> int:
+    """
+    Counts the sentences in a text the way Textstat's sentence_count does.
+    Sentences of two words or fewer are not counted, except that a text always has at least one sentence.
+
+    :param text: The String for which sentences should be counted.
+    :return:     The amount of sentences in the text.
+    """
+    sentences = sentence_pattern.findall(text)
+    short_sentences = sum(1 for sentence in sentences if len(remove_punctuation(sentence).split()) <= 2)
+    return max(1, len(sentences) - short_sentences)
+
+
 def remove_stop_words(text: str) -> (str, int):
     """
     Removes Dutch stop words in the NLTK Python library from a text.
@@ -39,56 +135,100 @@ def remove_stop_words(text: str) -> (str, int):
     :return:     A tuple including the same string as input without stop words, capitals and punctuation
                  and an integer representing the amount of removed stop words.
     """
-    text = text.lower()
-    text = textstat.remove_punctuation(text)
+    stops = stop_words()
+    words = remove_punctuation(text.lower()).split()
+    kept_words = [word for word in words if word not in stops]
+    return ' '.join(kept_words), len(words) - len(kept_words)
 
-    words = []
-    stop_count = 0
-    for word in text.split():
-        if word not in stops:
-            words.append(word)
-        else:
-            stop_count += 1
 
-    return ' '.join(words), stop_count
+def doc_lemmas(doc: spacy.tokens.Doc) -> tuple[str, ...]:
+    """
+    Gets the lemmas of a text processed by spaCy without capitals.
+    Lemmas can be capitalized by spaCy even if the text is not, e.g. the first word of the text.
+
+    :param doc: The text processed by the spaCy text lemmatizer.
+    :return:    Tuple containing the lemmas of the text without capitals.
+    """
+    return tuple(t.lemma_.lower() for t in doc)
 
 
-def text_lemmatizer(text: str) -> list[str]:
+@functools.lru_cache(maxsize=4096)
+def text_lemmatizer(text: str) -> tuple[str, ...]:
     """
     Text lemmatization or changing words to their base form.
-    WARNING: First word in the returned list is still capitalized!
+    The lemmas of recently lemmatized texts are cached.
 
     :param text: The String which should be lemmatized.
     :return:     Lemmatized string with no capitals or punctuation.
     """
     text = text.lower()
-    text = textstat.remove_punctuation(text)
-    doc = nlp(text)
-    cleaned_lemmas = [t.lemma_ for t in doc]
-    return cleaned_lemmas
+    text = remove_punctuation(text)
+    doc = spacy_model()(text)
+    return doc_lemmas(doc)
+
+
+def text_lemmatizer_batch(texts: Iterable[str], batch_size: int = 64) -> Iterator[tuple[str, ...]]:
+    """
+    Text lemmatization of multiple texts, which spaCy processes in batches.
+    Texts which are identical after cleaning are only lemmatized once.
+
+    :param texts:      The Strings which should be lemmatized.
+    :param batch_size: (optional) The amount of texts spaCy processes at a time, set to 64.
+    :return:           Generator of the lemmas of each text with no capitals or punctuation.
+    """
+    cleaned_texts = [remove_punctuation(text.lower()) for text in texts]
+    unique_texts = list(dict.fromkeys(cleaned_texts))
+
+    docs = spacy_model().pipe(unique_texts, batch_size=batch_size)
+    lemmas = {text: doc_lemmas(doc) for text, doc in zip(unique_texts, docs)}
+
+    for text in cleaned_texts:
+        yield lemmas[text]
+
+
+def score_texts(texts: list[str]) -> list[tuple[int, int, int, int, int, int]]:
+    """
+    Calculates the readability scores for a batch of texts using the Flesch-Douma, Leesindex A, CLIB
+    (two freq77 versions) and CILT (two freq77 versions).
+    Used by estimate_texts to score batches of texts in separate processes.
+
+    :param texts: The Strings for which the readability scores should be calculated.
+    :return:      List containing a tuple of the six readability scores for each text.
+    """
+    # Lemmatizes all texts in batches, both with and without stop words.
+    lemmas = text_lemmatizer_batch(texts)
+    lemmas_no_stop = text_lemmatizer_batch(remove_stop_words(text)[0] for text in texts)
+
+    scores = []
+    for text, text_lemmas, text_lemmas_no_stop in zip(texts, lemmas, lemmas_no_stop):
+        read_est = ReadabilityEstimation(text, text_lemmas, text_lemmas_no_stop)
+        scores.append((read_est.flesch_douma(), read_est.leesindex_a(), read_est.clib(),
+                       read_est.clib(freq_no_stop=False), read_est.cilt(), read_est.cilt(freq_no_stop=False)))
+
+    return scores
 
 
-def estimate_texts(dataset: str, file_out: str) -> None:
+def estimate_texts(dataset: str, file_out: str, workers: int = None, batch_size: int = 256) -> None:
     """
     Calculates the readability scores for texts using the Flesch-Douma, Leesindex A, CLIB (two freq77 versions)
     and CILT (two freq77 versions).
     Adds the scores under new columns to the existing dataset of texts.
+    The texts are scored in batches across multiple processes.
 
-    :param dataset:  The CSV file containing the texts.
-    :param file_out: The CSV file which will store the scores alongside the texts.
-    :return:         None
+    :param dataset:    The CSV file containing the texts.
+    :param file_out:   The CSV file which will store the scores alongside the texts.
+    :param workers:    (optional) The amount of processes scoring texts, set to the amount of CPUs.
+    :param batch_size: (optional) The amount of texts scored by a process at a time, set to 256.
+    :return:           None
     """
     df = pd.read_csv(dataset)
-    fd, lia, clib, clib_stop, cilt, cilt_stop = [[] for _ in range(6)]
+    texts = df["text"].tolist()
+    batches = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
 
-    for text in df["text"]:
-        read_est = ReadabilityEstimation(text)
-        fd.append(read_est.flesch_douma())
-        lia.append(read_est.leesindex_a())
-        clib.append(read_est.clib())
-        clib_stop.append(read_est.clib(freq_no_stop=False))
-        cilt.append(read_est.cilt())
-        cilt_stop.append(read_est.cilt(freq_no_stop=False))
+    with ProcessPoolExecutor(max_workers=workers, initializer=load_models) as executor:
+        scores = [score for batch in executor.map(score_texts, batches) for score in batch]
+
+    fd, lia, clib, clib_stop, cilt, cilt_stop = [list(column) for column in zip(*scores)] or [[] for _ in range(6)]
 
     df["FD-score"] = fd
     df["LiA-score"] = lia
@@ -99,22 +239,43 @@ def estimate_texts(dataset: str, file_out: str) -> None:
     df.to_csv(file_out, index=False)
 
 
-def map_score_to_grade(score: int, mapping: dict[range, [int]], formula: str) -> list[int]:
+def map_score_to_grade(score: int, table: (int, list[list[int]]), formula: str) -> list[int]:
     """
     Maps a range of scores to a list (range) of school grade given the mapping.
     For the existing mappings, see top of this module.
 
     :param score:   An integer representing a score.
-    :param mapping: A mapping from a range of scores to a list (range) of school grades.
+    :param table:   The lowest score and list (range) of school grades per score of a mapping, see mapping_to_table.
     :param formula: The String representation of the formula being mapped.
     :return:        List (range) of school grades as integers.
     """
-    for key in mapping:
-        if score in key:
-            return mapping[key]
+    lowest_score, grades = table
+    index = score - lowest_score
+    if 0 <= index < len(grades):
+        return grades[index]
     raise Exception("Invalid/Unknown score: " + str(score) + " for formula " + formula)
 
 
+def map_scores_to_grades(scores: pd.Series, table: (int, list[list[int]]), formula: str) -> list[list[int]]:
+    """
+    Maps a column of scores to lists (ranges) of school grades given the mapping.
+    Vectorized version of map_score_to_grade, the scores are checked against the table at once.
+
+    :param scores:  A column of integers representing scores.
+    :param table:   The lowest score and list (range) of school grades per score of a mapping, see mapping_to_table.
+    :param formula: The String representation of the formula being mapped.
+    :return:        List containing a list (range) of school grades as integers for each score.
+    """
+    lowest_score, grades = table
+    indices = scores.to_numpy() - lowest_score
+
+    invalid = (indices < 0) | (indices >= len(grades))
+    if invalid.any():
+        raise Exception("Invalid/Unknown score: " + str(scores[invalid].iloc[0]) + " for formula " + formula)
+
+    return [grades[index] for index in indices]
+
+
 def scores_to_grades(scores_file: str) -> None:
     """
     Maps the readability formula scores to grades or ranges of grades using score to grade maps
@@ -124,12 +285,12 @@ def scores_to_grades(scores_file: str) -> None:
     :return:            None.
     """
     df = pd.read_csv(scores_file)
-    df["FD-grade"] = df["FD-score"].apply(lambda x: map_score_to_grade(x, flesch_douma_mapping, "Flesch-Douma"))
-    df["LiA-grade"] = df["LiA-score"].apply(lambda x: map_score_to_grade(x, leesindex_a_mapping, "Leesindex A"))
-    df["CLIB-grade"] = df["CLIB-score"].apply(lambda x: map_score_to_grade(x, clib_mapping, "CLIB"))
-    df["CLIB_stop-grade"] = df["CLIB_stop-score"].apply(lambda x: map_score_to_grade(x, clib_mapping, "CLIB stop"))
-    df["CILT-grade"] = df["CILT-score"].apply(lambda x: map_score_to_grade(x, cilt_mapping, "CILT"))
-    df["CILT_stop-grade"] = df["CILT_stop-score"].apply(lambda x: map_score_to_grade(x, cilt_mapping, "CILT stop"))
+    df["FD-grade"] = map_scores_to_grades(df["FD-score"], flesch_douma_table, "Flesch-Douma")
+    df["LiA-grade"] = map_scores_to_grades(df["LiA-score"], leesindex_a_table, "Leesindex A")
+    df["CLIB-grade"] = map_scores_to_grades(df["CLIB-score"], clib_table, "CLIB")
+    df["CLIB_stop-grade"] = map_scores_to_grades(df["CLIB_stop-score"], clib_table, "CLIB stop")
+    df["CILT-grade"] = map_scores_to_grades(df["CILT-score"], cilt_table, "CILT")
+    df["CILT_stop-grade"] = map_scores_to_grades(df["CILT_stop-score"], cilt_table, "CILT stop")
     df.to_csv(scores_file, index=False)
 
 
@@ -138,59 +299,61 @@ class ReadabilityEstimation:
     Readability estimation class for the Dutch language using four well-known Dutch traditional readability formulas:
     Flesch-Douma, Leesindex A, CLIB and CILT.
     Their scores are rounded down to the nearest integer.
-
-    Attribute syllable_counter: A syllable counter class with a syllable dictionary.
-                                Used for counting syllables in a text.
-                                See syllable_counter.py for more information.
+    Syllables are counted by the shared syllable counter, see text_syllable_counter and syllable_counter.py.
     """
 
-    __syllable_counter = syllable_counter.SyllableCounter()
-
-    def __init__(self, text: str):
+    def __init__(self, text: str, lemmas: tuple[str, ...] = None, lemmas_no_stop: tuple[str, ...] = None):
         """
         Stores a piece of text, its main- and subtype and grade.
         Using the text, it calculates and stores variables used in multiple Dutch readability formulas.
 
-        :param text:     A piece of text from the BasiLex-corpus.
+        :param text:           A piece of text from the BasiLex-corpus.
+        :param lemmas:         (optional) The lemmas of the text without capitals, lemmatized here if not supplied.
+        :param lemmas_no_stop: (optional) The lemmas of the text without stop words and capitals,
+                               lemmatized here if not supplied.
         """
         self.text = text
-        self.sentence_count = textstat.sentence_count(text)
-        self.word_count = textstat.lexicon_count(text)
-        self.letter_count = textstat.letter_count(text)
-        self.syllable_count = self.__syllable_counter.count_syllables_text(text)
-        self.freq77 = self.calculate_freq77(freq77_list, text)
-        self.freq77_no_stop = self.calculate_freq77(freq77_no_stop_list, text, remove_stop=True)
-
-    def calculate_freq77(self, file: str, text: str, remove_stop=False) -> float:
-        """
-        Calculates the freq77 variable from the CLIB and CILT formulas.
-        Uses lemmatization as the frequency word list only contains lemmatized words.
-
-        :param file:        A Dutch word list with a cumulative frequency of 77%,
-                            i.e. the most frequent words in children's texts.
-                            Based upon Schrooten & Vermeer's frequency list.
-        :param text:        The String on which the freq77 should be calculated.
-        :param remove_stop: Boolean signifying if stop words should be removed from the text or not.
-        :return:            A float signifying the freq77.
-        """
-        fl = pd.read_csv(file)
-        fl = fl["word"].tolist()
-
-        stop_count = 0
-        if remove_stop:
-            text, stop_count = remove_stop_words(text)
-
-        text = text_lemmatizer(text)
-
-        frequent = 0
-        for word in text:
-            word = word.lower()
-            if word in fl:
-                frequent += 1
-        try:
-            return ((frequent + stop_count) / self.word_count) * 100
-        except ZeroDivisionError:
-            return 0.0
+        self.sentence_count = count_sentences(text)
+        self.syllable_count = text_syllable_counter().count_syllables_text(text)
+
+        # Punctuation is removed once and the resulting words are shared by the variables below.
+        # Letters are counted as Textstat's letter_count does, which only leaves out spaces.
+        without_punctuation = remove_punctuation(text)
+        self.letter_count = len(without_punctuation) - without_punctuation.count(" ")
+        cleaned_text = without_punctuation.lower()
+        self.words = cleaned_text.split()
+        self.word_count = len(self.words)
+        self.unique_word_count = len(set(self.words))
+
+        stops = stop_words()
+        words_no_stop = [word for word in self.words if word not in stops]
+
+        if lemmas is None:
+            lemmas = text_lemmatizer(cleaned_text)
+        if lemmas_no_stop is None:
+            lemmas_no_stop = text_lemmatizer(' '.join(words_no_stop))
+
+        # The freq77 variable from the CLIB and CILT formulas, stop words count as frequent words when removed.
+        frequent = sum(1 for lemma in lemmas if lemma in freq77_words)
+        frequent_no_stop = sum(1 for lemma in lemmas_no_stop if lemma in freq77_no_stop_words) \
+            + self.word_count - len(words_no_stop)
+
+        # The averages and percentages shared by the readability formulas, which score a text without words as 0.
+        self.words_per_sentence = self.word_count / self.sentence_count
+        if self.word_count > 0:
+            self.freq77 = (frequent / self.word_count) * 100
+            self.freq77_no_stop = (frequent_no_stop / self.word_count) * 100
+            self.syllables_per_word = self.syllable_count / self.word_count
+            self.letters_per_word = self.letter_count / self.word_count
+            self.type_token_ratio = (self.unique_word_count / self.word_count) * 100
+            self.sentences_per_word = (self.sentence_count / self.word_count) * 100
+        else:
+            self.freq77 = 0.0
+            self.freq77_no_stop = 0.0
+            self.syllables_per_word = 0.0
+            self.letters_per_word = 0.0
+            self.type_token_ratio = 0.0
+            self.sentences_per_word = 0.0
 
     def flesch_douma(self) -> int:
         """
@@ -199,11 +362,9 @@ class ReadabilityEstimation:
 
         :return: An integer score generated on a text by the Flesch-Douma formula.
         """
-        try:
-            return int(206.84 - (0.93 * (self.word_count / self.sentence_count))
-                       - (77 * (self.syllable_count / self.word_count)))
-        except ZeroDivisionError:
+        if self.word_count == 0:
             return 0
+        return int(206.84 - (0.93 * self.words_per_sentence) - (77 * self.syllables_per_word))
 
     def leesindex_a(self) -> int:
         """
@@ -212,11 +373,9 @@ class ReadabilityEstimation:
 
         :return: An integer score generated on a text by the Leesindex A formula.
         """
-        try:
-            return int(195 - (2 * (self.word_count / self.sentence_count))
-                       - (66.67 * (self.syllable_count / self.word_count)))
-        except ZeroDivisionError:
+        if self.word_count == 0:
             return 0
+        return int(195 - (2 * self.words_per_sentence) - (66.67 * self.syllables_per_word))
 
     def clib(self, freq_no_stop: bool = True) -> int:
         """
@@ -233,19 +392,10 @@ class ReadabilityEstimation:
         else:
             freq77 = self.freq77
 
-        unique_words = set()
-        text = self.text.lower()
-        text = textstat.remove_punctuation(text)
-
-        for word in text.split():
-            unique_words.add(word)
-
-        try:
-            return int(46 + (0.474 * freq77) - (6.603 * (self.letter_count / self.word_count))
-                       - (0.364 * ((len(unique_words) / self.word_count) * 100))
-                       + (1.425 * ((self.sentence_count / self.word_count) * 100)))
-        except ZeroDivisionError:
+        if self.word_count == 0:
             return 0
+        return int(46 + (0.474 * freq77) - (6.603 * self.letters_per_word) - (0.364 * self.type_token_ratio)
+                   + (1.425 * self.sentences_per_word))
 
     def cilt(self, freq_no_stop: bool = True) -> int:
         """
@@ -262,7 +412,6 @@ class ReadabilityEstimation:
         else:
             freq77 = self.freq77
 
-        try:
-            return int(150 - (114.49 + (0.28 * freq77) - (12.33 * (self.letter_count / self.word_count))))
-        except ZeroDivisionError:
+        if self.word_count == 0:
             return 0
+        return int(150 - (114.49 + (0.28 * freq77) - (12.33 * self.letters_per_word)))
@@ -1,7 +1,7 @@
+import json
 from typing import Callable
-from decimal import Decimal
+import numpy as np
 import pandas as pd
-from ast import literal_eval
 import matplotlib.pyplot as plt
 import seaborn as sns
 import metrics
@@ -9,16 +9,29 @@ import metrics
 
 def str_to_list(column: pd.Series) -> list[list[int]]:
     """
-    Changes a string representation of a list back to an actual list in Python using the Abstract Syntax Trees library.
+    Changes a string representation of a list back to an actual list in Python.
+    A list of integers is written the same in Python and JSON, so it is parsed by the faster JSON decoder.
 
     :param column: The pandas series containing string representations of lists.
     :return:       A list containing list representations of integers.
     """
-    return column.apply(lambda x: literal_eval(x))
+    return column.apply(json.loads)
+
+
+def str_to_bounds(column: pd.Series) -> (np.ndarray, np.ndarray):
+    """
+    Reads the first and last integer of string representations of lists without creating the lists.
+
+    :param column: The pandas series containing string representations of non-empty lists of integers.
+    :return:       Arrays containing the first and the last integer of each list.
+    """
+    low = column.str.extract(r"^\[(\d+)", expand=False).astype(int).to_numpy()
+    high = column.str.extract(r"(\d+)\]$", expand=False).astype(int).to_numpy()
+    return low, high
 
 
 def create_type_column(df: pd.DataFrame, pr_grades_column: str,
-                       metric: Callable[[list[list[int]], list[int]], Decimal]) -> list[Decimal]:
+                       metric: Callable[[list[list[int]], list[int]], str]) -> list[str]:
     """
     Creates a text type column for a specific readability formula and metric across the grades.
 
@@ -29,8 +42,12 @@ def create_type_column(df: pd.DataFrame, pr_grades_column: str,
     """
     column = []
 
+    # One pass over the text type splits it into grades, grades without texts get an empty dataframe.
+    grades = dict(tuple(df.groupby("grade")))
+    empty = df.iloc[0:0]
+
     for grade in range(8):
-        df_grade = df[df["grade"] == grade + 1]
+        df_grade = grades.get(grade + 1, empty)
         column.append(metric(df_grade[pr_grades_column], df_grade["grade"]))
 
     column.append(metric(df[pr_grades_column], df["grade"]))
@@ -38,88 +55,92 @@ def create_type_column(df: pd.DataFrame, pr_grades_column: str,
     return column
 
 
-def create_grade_type_table(results_file: str, pr_grades_column: str, table_file: str,
-                            metric: Callable[[list[list[int]], list[int]], Decimal]) -> None:
+def create_grade_type_table(types: dict[str, pd.DataFrame], pr_grades_column: str, table_file: str,
+                            metric: Callable[[list[list[int]], list[int]], str]) -> None:
     """
     Creates a table for a readability formula containing metric values for a specified metric across text types
     and grades.
 
-    :param results_file:     The CSV file containing expected grades, text types and predicted grades for each
-                             readability formula.
+    :param types:            The expected and predicted grades per text type as dataframes, keyed by the name of the
+                             text type in the table.
     :param pr_grades_column: The name of the predicted grades column for a specific readability formula and text type.
     :param table_file:       The CSV file in which the resulting pandas dataframe or table will be stored.
     :param metric:           The metric to be calculated on the predicted and expected grades.
     :return:                 None.
     """
-    df = pd.read_csv(results_file)
-
-    df[pr_grades_column] = str_to_list(df[pr_grades_column])
     table = pd.DataFrame()
 
     table[None] = ["Grade 1", "Grade 2", "Grade 3", "Grade 4", "Grade 5", "Grade 6", "Grade 7", "Grade 8", "All grades"]
-    table["School"] = create_type_column(df[df["maintype"] == "school"].loc[:, ["grade", pr_grades_column]],
-                                         pr_grades_column, metric)
-    table["Books"] = create_type_column(df[df["maintype"] == "leesboeken"].loc[:, ["grade", pr_grades_column]],
-                                        pr_grades_column, metric)
-    table["Media"] = create_type_column(df[df["maintype"] == "media"].loc[:, ["grade", pr_grades_column]],
-                                        pr_grades_column, metric)
-    table["All types"] = create_type_column(df.loc[:, ["grade", pr_grades_column]], pr_grades_column, metric)
+    for type_name, df_type in types.items():
+        table[type_name] = create_type_column(df_type, pr_grades_column, metric)
 
     table.to_csv(table_file, index=False)
 
 
-def create_formula_tables(results_file: str, pr_grades_column: str, formula: str) -> None:
+def create_formula_tables(types: dict[str, pd.DataFrame], pr_grades_column: str, formula: str) -> None:
     """
     Creates three tables for a specific readability formula containing three different metric values
     across both text types and grades.
 
-    :param results_file:     The CSV file containing expected grades, text types and predicted grades for each
-                             readability formula.
+    :param types:            The expected and predicted grades per text type as dataframes, keyed by the name of the
+                             text type in the table.
     :param pr_grades_column: The name of the predicted grades column for a specific readability formula and text type.
     :param formula:          The name of the readability formula for which three metric tables should be created.
     :return:                 None.
     """
     table_file = "Data/Tables/"
-    create_grade_type_table(results_file, pr_grades_column, table_file + formula +
-                            "_accuracy_table.csv", metrics.accuracy)
-    create_grade_type_table(results_file, pr_grades_column, table_file + formula + "_mae_table.csv", metrics.mae)
-    create_grade_type_table(results_file, pr_grades_column, table_file + formula + "_rmse_table.csv", metrics.rmse)
+    create_grade_type_table(types, pr_grades_column, table_file + formula + "_accuracy_table.csv", metrics.accuracy)
+    create_grade_type_table(types, pr_grades_column, table_file + formula + "_mae_table.csv", metrics.mae)
+    create_grade_type_table(types, pr_grades_column, table_file + formula + "_rmse_table.csv", metrics.rmse)
 
 
 def create_tables(results_file: str) -> None:
     """
     Creates 18 tables, three for each readability formula (three different metrics), containing metric values across
     text types and grades.
+    The results are read and split into text types once for all tables.
 
     :param results_file: The CSV file containing expected grades, text types and predicted grades for each
                          readability formula.
     :return:             None.
     """
-    create_formula_tables(results_file, "FD-grade", "Flesch-Douma")
-    create_formula_tables(results_file, "LiA-grade", "Leesindex_A")
-    create_formula_tables(results_file, "CLIB-grade", "CLIB")
-    create_formula_tables(results_file, "CLIB_stop-grade", "CLIB_stop")
-    create_formula_tables(results_file, "CILT-grade", "CILT")
-    create_formula_tables(results_file, "CILT_stop-grade", "CILT_stop")
+    pr_grades_columns = ["FD-grade", "LiA-grade", "CLIB-grade", "CLIB_stop-grade", "CILT-grade", "CILT_stop-grade"]
+    df = pd.read_csv(results_file, usecols=["grade", "maintype"] + pr_grades_columns, dtype={"maintype": "category"})
 
+    for pr_grades_column in pr_grades_columns:
+        df[pr_grades_column] = str_to_list(df[pr_grades_column])
 
-def calculate_error_rate_per_formula(expect_list: list[int], predict_list: list[list[int]]) -> list[int]:
+    # One pass over the results splits them into text types, text types without texts get an empty dataframe.
+    by_type = dict(tuple(df.groupby("maintype", observed=True)))
+    empty = df.iloc[0:0]
+    types = {"School": by_type.get("school", empty), "Books": by_type.get("leesboeken", empty),
+             "Media": by_type.get("media", empty), "All types": df}
+
+    create_formula_tables(types, "FD-grade", "Flesch-Douma")
+    create_formula_tables(types, "LiA-grade", "Leesindex_A")
+    create_formula_tables(types, "CLIB-grade", "CLIB")
+    create_formula_tables(types, "CLIB_stop-grade", "CLIB_stop")
+    create_formula_tables(types, "CILT-grade", "CILT")
+    create_formula_tables(types, "CILT_stop-grade", "CILT_stop")
+
+
+def calculate_error_rate_per_formula(expect_list: pd.Series, predict_list: pd.Series) -> np.ndarray:
     """
     Calculates the error rates between a column of expected grades and a column of predicted grades of a specific
     readability formula.
+    Predictions are ascending ranges of grades, so the error rate is the distance from the expected grade to the
+    lowest or highest predicted grade, or 0 when the expected grade lies in the range (see metrics.abs_error_rate).
 
-    :param expect_list:  A column or list containing the expected grades of texts.
-    :param predict_list: A column or list containing lists or ranges of predicted grades of texts from a readability
-                         formula.
-    :return:             A column or list containing the absolute error rates between each expected grade and list of
+    :param expect_list:  A column containing the expected grades of texts.
+    :param predict_list: A column containing string representations of lists or ranges of predicted grades of texts
+                         from a readability formula.
+    :return:             An array containing the absolute error rates between each expected grade and list of
                          predicted grades.
     """
-    error_rates = []
-
-    for (pr, ex) in zip(predict_list, expect_list):
-        error_rates.append(metrics.abs_error_rate(pr, ex))
+    ex = expect_list.to_numpy()
+    low, high = str_to_bounds(predict_list)
 
-    return error_rates
+    return np.maximum(0, np.maximum(low - ex, ex - high))
 
 
 def calculate_error_rates(results_file: str) -> None:
@@ -134,12 +155,12 @@ def calculate_error_rates(results_file: str) -> None:
     df = pd.read_csv(results_file)
     ex = df["grade"]
 
-    df["FD-er"] = calculate_error_rate_per_formula(ex, str_to_list(df["FD-grade"]))
-    df["LiA-er"] = calculate_error_rate_per_formula(ex, str_to_list(df["LiA-grade"]))
-    df["CLIB-er"] = calculate_error_rate_per_formula(ex, str_to_list(df["CLIB-grade"]))
-    df["CLIB_stop-er"] = calculate_error_rate_per_formula(ex, str_to_list(df["CLIB_stop-grade"]))
-    df["CILT-er"] = calculate_error_rate_per_formula(ex, str_to_list(df["CILT-grade"]))
-    df["CILT_stop-er"] = calculate_error_rate_per_formula(ex, str_to_list(df["CILT_stop-grade"]))
+    df["FD-er"] = calculate_error_rate_per_formula(ex, df["FD-grade"])
+    df["LiA-er"] = calculate_error_rate_per_formula(ex, df["LiA-grade"])
+    df["CLIB-er"] = calculate_error_rate_per_formula(ex, df["CLIB-grade"])
+    df["CLIB_stop-er"] = calculate_error_rate_per_formula(ex, df["CLIB_stop-grade"])
+    df["CILT-er"] = calculate_error_rate_per_formula(ex, df["CILT-grade"])
+    df["CILT_stop-er"] = calculate_error_rate_per_formula(ex, df["CILT_stop-grade"])
 
     df.to_csv(results_file, index=False)
 
@@ -162,19 +183,17 @@ def create_formula_dataframe(df: pd.DataFrame, formula: str) -> pd.DataFrame:
     return df_form
 
 
-def create_type_dataframe(df: pd.DataFrame, maintype: str) -> pd.DataFrame:
+def create_type_dataframe(df_type: pd.DataFrame, maintype: str) -> pd.DataFrame:
     """
     Creates a dataframe for a specific text type containing expected grades, absolute error rates
     between expected grades and predicted grades, names of the readability formulas and text type.
 
-    :param df:       Dataframe containing expected grades, text types and absolute error rates for each readability
-                     formula.
+    :param df_type:  Dataframe containing expected grades and absolute error rates for each readability formula
+                     of the texts of a single text type.
     :param maintype: The text type for which a dataframe should be created.
     :return:         Dataframe containing expected grades, absolute error rates, names of readability formulas and the
                      text type.
     """
-    df_type = df[df["maintype"] == maintype]
-
     df_type = df_type[["grade", "FD-er", "LiA-er", "CLIB-er", "CLIB_stop-er", "CILT-er", "CILT_stop-er"]]
 
     df_fd = create_formula_dataframe(df_type, "FD")
@@ -211,11 +230,16 @@ def create_boxplot_data(results_file: str, file_out: str) -> None:
     :return:             None.
     """
     calculate_error_rates(results_file)
-    df = pd.read_csv(results_file)
+    df = pd.read_csv(results_file, usecols=["grade", "maintype", "FD-er", "LiA-er", "CLIB-er", "CLIB_stop-er",
+                                            "CILT-er", "CILT_stop-er"], dtype={"maintype": "category"})
+
+    # One pass over the results splits them into text types, text types without texts get an empty dataframe.
+    by_type = dict(tuple(df.groupby("maintype", observed=True)))
+    empty = df.iloc[0:0]
 
-    school = create_type_dataframe(df, "school")
-    books = create_type_dataframe(df, "leesboeken")
-    media = create_type_dataframe(df, "media")
+    school = create_type_dataframe(by_type.get("school", empty), "school")
+    books = create_type_dataframe(by_type.get("leesboeken", empty), "leesboeken")
+    media = create_type_dataframe(by_type.get("media", empty), "media")
 
     merged = pd.concat([school, books, media])
     merged.to_csv(file_out, index=False)
@@ -1,4 +1,7 @@
-import codecs
+import functools
+import os
+import pickle
+from collections import Counter
 import textstat
 import re
 import unicodedata
@@ -7,8 +10,17 @@ from typing import Optional
 # The path to the CELEX dpw.cd file.
 celex_path = "path/to/celex/file/dpw.cd"
 
+# The version of the parsed dictionary stored next to the CELEX file, to be increased whenever read_celex changes.
+celex_cache_version = 1
 
-def dictionary_init() -> dict[str, int]:
+# The Textstat library is used as a fallback for Dutch words, its language is a global setting and set once.
+textstat.set_lang("nl")
+
+# Endings of the first word of a compound word of which the s can be part of the second word instead.
+plural_s_suffixes = ("es", "els", "ens", "ers", "ems", "ies", "eaus")
+
+
+def read_celex() -> dict[str, int]:
     """
     Reads the CELEX dataset and turns it into a word-syllable count dictionary.
 
@@ -16,40 +28,90 @@ def dictionary_init() -> dict[str, int]:
     """
     dictionary = {}
 
-    f = codecs.open(celex_path, encoding='utf-8')
-    lines = f.readlines()
-    f.close()
+    # The file is read line by line as bytes and each line is only split up to the syllables field.
+    # Only the words are decoded, the syllables are counted in the bytes.
+    with open(celex_path, 'rb') as f:
+        for line in f:
+            fields = line.split(b"\\", 5)
+            syllables = fields[4]
+            if syllables == b"":
+                continue
+            syllable_count = syllables.count(b"-") + 1
+            dictionary[fields[1].decode('utf-8').lower()] = syllable_count
+
+    return dictionary
 
-    for line in lines:
-        fields = line.split("\\")
-        word = fields[1]
-        syllables = fields[4]
-        if syllables == "":
-            continue
-        syllable_count = len(syllables.split("-"))
-        dictionary[word.lower()] = syllable_count
+
+@functools.cache
+def dictionary_init() -> dict[str, int]:
+    """
+    Gets the word-syllable count dictionary of the CELEX dataset.
+    The dictionary is stored as a pickle file named after celex_cache_version next to the CELEX dataset and loaded
+    from there as long as it is not older than the dataset, otherwise the dataset is read (see read_celex) and the
+    pickle file is written.
+    The dictionary is obtained the first time it is needed and shared afterwards.
+
+    :return: Dictionary containing Dutch words and their syllable count.
+    """
+    cache_path = celex_path + ".v" + str(celex_cache_version) + ".pickle"
+
+    try:
+        if os.path.getmtime(cache_path) >= os.path.getmtime(celex_path):
+            with open(cache_path, 'rb') as f:
+                return pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError):
+        pass
+
+    dictionary = read_celex()
+
+    # Written to a temporary file first so processes never load a partially written dictionary.
+    temporary_path = cache_path + "." + str(os.getpid())
+    try:
+        with open(temporary_path, 'wb') as f:
+            pickle.dump(dictionary, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary_path, cache_path)
+    except OSError:
+        # The temporary file is not left behind in the CELEX folder.
+        try:
+            os.remove(temporary_path)
+        except OSError:
+            pass
 
     return dictionary
 
 
-def split_composite_word(word: str, split: int) -> (str, str):
+@functools.lru_cache(maxsize=None)
+def textstat_syllable_count(word: str) -> int:
     """
-    Splits a string into two strings at the specified index.
+    Counts the amount of syllables in a word using Textstat's syllable_count method set to Dutch.
+    The counts are cached as the same unknown words and parts of compound words are counted repeatedly.
 
-    :param word:  The String that should be split.
-    :param split: The index at which the String should be split.
-    :return:      The two halves of the split String.
+    :param word: The String for which syllables should be counted.
+    :return:     The amount of syllables in the word according to Textstat.
     """
-    return word[0:split], word[split:len(word)]
+    return textstat.syllable_count(word)
+
+
+# Apostrophes which are not between letters, numbers or underscores.
+# The pattern starts with the apostrophe so only apostrophes are checked for surrounding word characters.
+apostrophe_pattern = re.compile(r"\'(?:(?<!\w\')|(?!\w))")
+
+# All forms of punctuation except apostrophes, the table removes them from ASCII text where it is faster.
+punctuation_pattern = re.compile(r"[^\w\s\']")
+punctuation_table = {code_point: None for code_point in range(128) if punctuation_pattern.match(chr(code_point))}
 
 
 def strip_accents(text: str) -> str:
     """
     Strip the accents from the input text by transforming to ASCII and back to UTF-8.
+    ASCII text has no accents and is returned as is.
 
     :param text: The text given.
     :returns:    The text without accents.
     """
+    if text.isascii():
+        return text
+
     text = unicodedata.normalize('NFD', text)
     text = text.encode('ascii', 'ignore')
     text = text.decode("utf-8")
@@ -63,7 +125,7 @@ def remove_apostrophes(text: str) -> str:
     :param text: The text from which apostrophes not within words should be removed.
     :return:     The text without apostrophes except in words.
     """
-    return re.sub(r"(?<!\w)\'(?=\w)|(?<=\w)\'(?!\w)|(?<!\w)\'(?!\w)", '', text)
+    return apostrophe_pattern.sub('', text)
 
 
 def remove_punctuation(text: str) -> str:
@@ -73,7 +135,9 @@ def remove_punctuation(text: str) -> str:
     :param text: The text from which punctuation should be removed.
     :return:     The text without punctuation except apostrophes.
     """
-    return re.sub(r"[^\w\s\']", '', text)
+    if text.isascii():
+        return text.translate(punctuation_table)
+    return punctuation_pattern.sub('', text)
 
 
 def clean_text(text: str) -> str:
@@ -94,18 +158,19 @@ class SyllableCounter:
     """
     A syllable counter for Dutch words and texts using a dictionary of known Dutch words and their syllables.
 
-    Attribute dictionary: Dictionary containing Dutch words as keys to their syllable counts.
+    Attribute dictionary:     Dictionary containing Dutch words as keys to their syllable counts.
+    Attribute syllable_cache: Dictionary containing counted words which are not in the dictionary as keys to their
+                              syllable counts.
     """
 
-    __dictionary = dictionary_init()
-
     def __init__(self):
         """
-        Sets the language of the used Textstat library to Dutch and sets the accuracy test counters to zero.
+        Gets the shared dictionary, sets the accuracy test counters to zero and empties the syllable cache.
         """
-        textstat.set_lang("nl")
+        self.__dictionary = dictionary_init()
         self.textstat_count = 0
         self.unknown_count = 0
+        self.syllable_cache = {}
 
     def get_dictionary(self) -> dict[str, int]:
         """
@@ -129,41 +194,40 @@ class SyllableCounter:
         """
         # Split a word while never dealing with a single character.
         for i in range(len(word) - 2, 1, -1):
-            word1, word2 = split_composite_word(word, i)
+            word1, word2 = word[:i], word[i:]
 
             if word1 in self.__dictionary:
                 if word2 in self.__dictionary:
                     # Word could be split into two known words.
                     return self.__dictionary[word1] + self.__dictionary[word2]
 
-                # Checks if splitting the word earlier can give a better split.
-                for j in range(len(word1), 1, -1):
-                    split1, split2 = split_composite_word(word1, j)
-                    split2 += word2
+                # Checks if splitting the word earlier can give a better split, the split at i is known to fail.
+                for j in range(i - 1, 1, -1):
+                    split1, split2 = word[:j], word[j:]
 
                     if split1 in self.__dictionary and split2 in self.__dictionary:
                         return self.__dictionary[split1] + self.__dictionary[split2]
 
                 # Checks if a plural s in a compound word is part of the second word instead.
-                if (word1.endswith("es") or word1.endswith("els") or word1.endswith("ens") or word1.endswith("ers")
-                    or word1.endswith("ems") or word1.endswith("ies") or word1.endswith("eaus")) \
-                        and word1[0:len(word1) - 1] in self.__dictionary:
-
-                    return self.__dictionary[word1[0:len(word1) - 1]] \
-                        + self.count_syllables_word("s" + word2, original, test_accuracy)
+                if word1.endswith(plural_s_suffixes):
+                    stem = word1[:-1]
+                    if stem in self.__dictionary:
+                        return self.__dictionary[stem] + self.count_syllables_word("s" + word2, original, test_accuracy)
 
                 # First part of the compound word is known.
                 return self.__dictionary[word1] + self.count_syllables_word(word2, original, test_accuracy)
 
         # Checks if a connection s in a compound word was added.
         if word[0] == "s" and word != original:
-            return self.count_syllables_word(word[1:len(word)], original, test_accuracy)
+            return self.count_syllables_word(word[1:], original, test_accuracy)
 
     def count_syllables_word(self, word: str, original: str, test_accuracy: bool = False) -> int:
         """
         Counts the amount of syllables in a given word String.
+        Words which are not in the dictionary are split or counted by Textstat once, afterwards their syllables are
+        taken from the syllable cache.
         test_accuracy is used in test_accuracy_syllable_counter.py to test the accuracy of the
-        syllable counter.
+        syllable counter, these counts do not use the syllable cache.
 
         :param word:          The String for which syllables should be counted.
         :param original:      The original String entered.
@@ -173,22 +237,30 @@ class SyllableCounter:
         if word in self.__dictionary:
             return self.__dictionary[word]
 
+        # Only whole words are cached, parts of a compound word depend on the original word.
+        use_cache = word == original and not test_accuracy
+        if use_cache and word in self.syllable_cache:
+            return self.syllable_cache[word]
+
         # Checks if parts of the compound word are in the class dictionary.
-        composite_syllables = self.composite_word_syllables(word, original, test_accuracy)
-        if composite_syllables is not None:
-            return composite_syllables
+        syllables = self.composite_word_syllables(word, original, test_accuracy)
+
+        if syllables is None:
+            if test_accuracy:
+                self.textstat_count += 1
+                if word == original:
+                    self.unknown_count += 1
+            # If a word or parts of the word are not in the class dictionary, use Textstat's syllable_count method.
+            syllables = textstat_syllable_count(word)
 
-        if test_accuracy:
-            self.textstat_count += 1
-            if word == original:
-                self.unknown_count += 1
-        # If a word or parts of the word are not in the class dictionary, use Textstat's syllable_count method.
-        return textstat.syllable_count(word)
+        if use_cache:
+            self.syllable_cache[word] = syllables
+        return syllables
 
     def count_syllables_text(self, text: str) -> int:
         """
         Counts the amount of syllables in a piece of text String.
-        Uses the count_syllables_word method to count syllables for each word in the text.
+        Uses the count_syllables_word method to count syllables once for each distinct word in the text.
 
         :param text: The String for which syllables should be counted
         :return:     The amount of syllables in the text.
@@ -196,7 +268,7 @@ class SyllableCounter:
         text = clean_text(text)
         syllable_count = 0
 
-        for word in text.split():
-            syllable_count += self.count_syllables_word(word, word)
+        for word, word_count in Counter(text.split()).items():
+            syllable_count += word_count * self.count_syllables_word(word, word)
 
         return syllable_count
@@ -14,8 +14,8 @@ def error_rates_per_formula_and_type(results_file: str, file_out: str, type_to_c
     :param type_to_compare: A specific type to compare to the other types. This limits the entries by a grade range.
     :return:                None.
     """
-    df = pd.read_csv(results_file)
-    out = df[["grade", "maintype", "FD-er", "LiA-er", "CLIB-er", "CLIB_stop-er", "CILT-er", "CILT_stop-er"]].copy()
+    columns = ["grade", "maintype", "FD-er", "LiA-er", "CLIB-er", "CLIB_stop-er", "CILT-er", "CILT_stop-er"]
+    out = pd.read_csv(results_file, usecols=columns)[columns]
     out = out.rename(columns={"FD-er": "FD", "LiA-er": "LiA", "CLIB-er": "CLIB", "CLIB_stop-er": "CLIB_stop",
                               "CILT-er": "CILT", "CILT_stop-er": "CILT_stop"})
 
@@ -27,23 +27,6 @@ def error_rates_per_formula_and_type(results_file: str, file_out: str, type_to_c
     out.to_csv(file_out, index=False)
 
 
-def formula_dataframe(df: pd.DataFrame, formula: str) -> pd.DataFrame:
-    """
-    Creates a dataframe of the absolute error rates of one readability formula and adds a column with the name of that
-    readability formula.
-
-    :param df:      Dataframe containing the error rates on every text in the data set of the supplied
-                    readability formula.
-    :param formula: The name of the readability formula for which a dataframe is constructed.
-    :return:        Dataframe containing error rates and name of the readability formula.
-    """
-    er_f = formula + "-er"
-    fd = df[[er_f]].copy()
-    fd["Formula"] = formula
-    fd = fd.rename(columns={er_f: "error_rate"})
-    return fd
-
-
 def error_rates_per_text_and_formula(error_rates: str, file_out: str) -> None:
     """
     Creates a dataframe containing the absolute error rates for each six readability formulas per text and stores
@@ -55,14 +38,11 @@ def error_rates_per_text_and_formula(error_rates: str, file_out: str) -> None:
                         Used in significance testing.
     :return:            None.
     """
-    df = pd.read_csv(error_rates)
+    columns = ["FD-er", "LiA-er", "CLIB-er", "CLIB_stop-er", "CILT-er", "CILT_stop-er"]
+    df = pd.read_csv(error_rates, usecols=columns)
 
-    fd = formula_dataframe(df, "FD")
-    lia = formula_dataframe(df, "LiA")
-    clib = formula_dataframe(df, "CLIB")
-    clib_stop = formula_dataframe(df, "CLIB_stop")
-    cilt = formula_dataframe(df, "CILT")
-    cilt_stop = formula_dataframe(df, "CILT_stop")
+    # Stacks the error rate columns in the order of columns, the formula name is the column name without "-er".
+    out = df.melt(value_vars=columns, var_name="Formula", value_name="error_rate")
+    out["Formula"] = out["Formula"].str.removesuffix("-er")
 
-    out = pd.concat([fd, lia, clib, clib_stop, cilt, cilt_stop])
-    out.to_csv(file_out, index=False)
+    out[["error_rate", "Formula"]].to_csv(file_out, index=False)
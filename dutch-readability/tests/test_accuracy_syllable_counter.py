@@ -1,6 +1,6 @@
+import itertools
 from .. import syllable_counter
 import pandas as pd
-import textstat
 
 
 def read_unique_words(file_in: str) -> set["str"]:
@@ -11,15 +11,10 @@ def read_unique_words(file_in: str) -> set["str"]:
     :param file_in: A CSV file containing texts in a column named 'text'.
     :return:        A set of unique words in texts in the supplied file.
     """
-    dataset = pd.read_csv(file_in)
-    unique_words_set = set()
+    dataset = pd.read_csv(file_in, usecols=["text"])
 
-    for text in dataset["text"]:
-        text = syllable_counter.clean_text(text)
-        for word in text.split():
-            unique_words_set.add(word)
-
-    return unique_words_set
+    # The words of each cleaned text are added to the set directly, only the unique words are kept in memory.
+    return set(itertools.chain.from_iterable(syllable_counter.clean_text(text).split() for text in dataset["text"]))
 
 
 def accuracy_whole_unique_words(dataset: set[str]) -> str:
@@ -73,8 +68,12 @@ def accuracy_syllable_counter(file: str = "Data/words_and_syllables.csv") -> str
     sc = syllable_counter.SyllableCounter()
     words_syllables = pd.read_csv(file, sep=';')
 
-    syllable_count_sc = words_syllables["word"].apply(lambda x: sc.count_syllables_word(x, x))
-    syllable_count_ts = words_syllables["word"].apply(lambda x: textstat.syllable_count(x))
+    # Words are looked up in the dictionary directly, only the other words are counted by the syllable counter.
+    syllable_count_sc = words_syllables["word"].map(sc.get_dictionary().get)
+    missing = syllable_count_sc.isna()
+    syllable_count_sc[missing] = words_syllables.loc[missing, "word"].apply(lambda x: sc.count_syllables_word(x, x))
+    syllable_count_sc = syllable_count_sc.astype(int)
+    syllable_count_ts = words_syllables["word"].apply(syllable_counter.textstat_syllable_count)
 
     accuracy_sc = (syllable_count_sc == words_syllables["syllables"]).mean()
     accuracy_ts = (syllable_count_ts == words_syllables["syllables"]).mean()